@@ -4,7 +4,6 @@ Main entry point for the Hide and Seek ear training app
 
 import argparse
 import sys
-from .game import HideAndSeekGame
 
 def main():
     """Main CLI function"""
@@ -82,7 +81,11 @@ Examples:
         print("Error: Tolerance must be positive")
         sys.exit(1)
     
-    # Create and run the game
+    # Create and run the game (imported here so that --help and --list-notes
+    # don't pay for loading the audio stack)
+    from .game import HideAndSeekGame
+    
+    game = None
     try:
         game = HideAndSeekGame(tolerance_cents=args.tolerance, debug=args.debug)
         game.run_game(num_distinct_notes=args.distinct_notes, sequence_length=args.num_notes)
@@ -92,6 +95,9 @@ Examples:
         print(f"\nError: {e}")
         print("Make sure your microphone and speakers are working properly.")
         sys.exit(1)
+    finally:
+        if game is not None:
+            game.audio_player.close()
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    raise SystemExit(main()) 
\ No newline at end of file
@@ -2,22 +2,121 @@
 Audio playback and recording utilities
 """
 
-import numpy as np
-import sounddevice as sd
-import soundfile as sf
+import queue
 import threading
 import time
-from typing import Optional, Tuple
-from scipy import signal
-from .notes import is_note_close
+import numpy as np
+import sounddevice as sd
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator, Optional, Tuple
+from .notes import cents_diff, generate_sine_wave, is_note_close
+
+# Streaming recorder: the microphone delivers blocks of STREAM_BLOCKSIZE
+# samples, a pitch estimate is made every ESTIMATE_EVERY_BLOCKS blocks
+# (~93 ms at 44.1 kHz) and listening stops early once STABLE_ESTIMATES
+# consecutive estimates agree. If no block arrives for
+# STREAM_TIMEOUT_BLOCKS block periods (~230 ms) the microphone is taken to
+# have stopped delivering audio.
+STREAM_BLOCKSIZE = 1024
+ESTIMATE_EVERY_BLOCKS = 4
+STABLE_ESTIMATES = 3
+STREAM_TIMEOUT_BLOCKS = 10
+
+# YIN pitch detection: the first lag whose normalised difference dips below
+# YIN_THRESHOLD is taken as the period. If none does, the best lag is still
+# accepted as long as its difference is below YIN_MAX_APERIODICITY;
+# anything noisier is treated as "no clear pitch".
+YIN_THRESHOLD = 0.1
+YIN_MAX_APERIODICITY = 0.3
+
+@lru_cache(maxsize=None)
+def _scipy_fft():
+    """
+    Import scipy.fft on first use.
+    
+    It takes ~140 ms to import and only pitch detection needs it, which
+    Scale Detective never runs. AudioPlayer's pitch detection warm-up pays
+    for the import before the first recording.
+    """
+    import scipy.fft
+    return scipy.fft
+
+def _first_dip(normalized: np.ndarray, min_lag: int, max_lag: int, threshold: float) -> Optional[int]:
+    """
+    Find the bottom of the first dip below threshold in a YIN difference function.
+    
+    np.argmax on a boolean array stops at the first True, so the search
+    stops at the first crossing instead of collecting every lag below the
+    threshold the way np.flatnonzero would.
+    
+    Args:
+        normalized: Cumulative mean normalised difference d'(tau)
+        min_lag: First lag to consider
+        max_lag: Lag to stop before
+        threshold: Dip threshold
+        
+    Returns:
+        Lag of the local minimum following the first crossing, or None if d'
+        never drops below threshold in range
+    """
+    below = normalized[min_lag:max_lag] < threshold
+    first = int(np.argmax(below))
+    if not below[first]:
+        return None
+    
+    lag = min_lag + first
+    while lag + 1 < max_lag and normalized[lag + 1] < normalized[lag]:
+        lag += 1
+    return lag
 
 class AudioPlayer:
     """Handles audio playback and recording"""
     
     def __init__(self, sample_rate: int = 44100):
         self.sample_rate = sample_rate
-        self._current_stream = None
-        self._is_playing = False
+        
+        # All playback goes through one persistent output stream. Its callback
+        # plays the current sound, or silence when there is none, so a note is
+        # stopped early just by dropping it.
+        self._output_stream = None
+        self._playback_lock = threading.Lock()
+        self._playback_audio = None
+        self._playback_position = 0
+        self._playback_done = threading.Event()
+        self._playback_done.set()
+        
+        # Microphone input also runs on one persistent stream. Its callback
+        # only queues blocks while a recording is in progress.
+        self._input_stream = None
+        self._input_blocks = queue.Queue()
+        self._capturing = threading.Event()
+        
+        # Ask PortAudio for its low-latency buffering on every stream we open;
+        # the default ('high') adds 100-200 ms each way on some hosts
+        sd.default.latency = 'low'
+        sd.default.samplerate = sample_rate
+        
+        # Violin fundamentals sit far below the Nyquist frequency, so pitch
+        # detection runs on every other sample, with no low-pass filter first.
+        # YIN compares the waveform with delayed copies of itself, and keeping
+        # every other sample of a periodic signal leaves it periodic with the
+        # same period: harmonics above the new Nyquist frequency fold down
+        # without moving the period estimate. Only aperiodic content (noise)
+        # folds down, which slightly raises the difference floor.
+        self._decimation = 2
+        self._analysis_rate = sample_rate / self._decimation
+        
+        # Pitch detection analyses frames of this many (decimated) samples,
+        # ~186 ms. A power of two is the fastest FFT length for every backend,
+        # and keeping it fixed means pocketfft's plan cache (keyed on length)
+        # is reused on every call.
+        self._frame_size = 4096
+        self._pitch_detection_warm = False
+        
+        # The feedback sounds never change, so synthesise them once
+        self._water_drop_sound = self._make_water_drop_sound()
+        self._click_sound = self._make_click_sound()
         
     def play_note(self, frequency: float, duration: float = 2.0, volume: float = 0.3) -> None:
         """
@@ -28,84 +127,164 @@ class AudioPlayer:
             duration: Duration in seconds
             volume: Volume level (0.0 to 1.0)
         """
-        from .notes import generate_sine_wave
-        
-        # Generate the sine wave
-        audio = generate_sine_wave(frequency, duration, self.sample_rate)
-        
-        # Apply volume
-        audio = audio * volume
+        # Generate the sine wave at the requested volume
+        audio = self.render_note(frequency, duration, volume)
         
         # Play the audio
-        sd.play(audio, self.sample_rate)
-        sd.wait()  # Wait until audio is finished playing
+        self.play_audio(audio)
         
     def play_note_non_blocking(self, frequency: float, duration: float = 2.0, volume: float = 0.3) -> None:
         """
         Play a note without blocking. Can be stopped with stop_current_note().
         
+        The note replaces anything already playing.
+        
         Args:
             frequency: Frequency in Hz
             duration: Duration in seconds
             volume: Volume level (0.0 to 1.0)
         """
-        from .notes import generate_sine_wave
+        # Generate the sine wave at the requested volume
+        audio = self.render_note(frequency, duration, volume)
         
-        # Stop any currently playing note
-        self.stop_current_note()
+        # Play the audio without waiting
+        self._start_playback(audio)
         
-        # Generate the sine wave
-        audio = generate_sine_wave(frequency, duration, self.sample_rate)
+    def render_note(self, frequency: float, duration: float = 2.0, volume: float = 0.3) -> np.ndarray:
+        """
+        Render a note to a buffer that can be passed to play_audio().
         
-        # Apply volume
-        audio = audio * volume
+        Args:
+            frequency: Frequency in Hz
+            duration: Duration in seconds
+            volume: Volume level (0.0 to 1.0)
+            
+        Returns:
+            Read-only float32 samples (shared with other callers)
+        """
+        return generate_sine_wave(frequency, duration, self.sample_rate, amplitude=volume)
+    
+    def play_audio(self, audio: np.ndarray) -> None:
+        """
+        Play audio through a persistent output stream, returning once it has finished playing.
         
-        # Play the audio without waiting
-        self._current_stream = sd.play(audio, self.sample_rate)
-        self._is_playing = True
+        Opening a PortAudio stream costs tens of milliseconds on some hosts,
+        which sd.play() pays for every note. The stream is opened on first use
+        and kept running until close().
         
+        Args:
+            audio: Mono float32 samples
+        """
+        self._start_playback(audio)
+        
+        # The callback reports when it has handed over the last samples. Allow
+        # a second of slack so a stalled device can't hang the game.
+        if not self._playback_done.wait(len(audio) / self.sample_rate + 1.0):
+            self.stop_current_note()
+        # Those last samples are still in PortAudio's buffer; wait for them to
+        # reach the speaker too, so that a recording started next doesn't
+        # pick up the end of this sound
+        time.sleep(self._output_stream.latency)
+    
+    def _start_playback(self, audio: np.ndarray) -> None:
+        """Start playing audio on the persistent output stream, replacing the current sound"""
+        if self._output_stream is None:
+            self._output_stream = sd.OutputStream(samplerate=self.sample_rate, channels=1, dtype='float32',
+                                                  callback=self._output_callback)
+            self._output_stream.start()
+        if len(audio) == 0:
+            return
+        with self._playback_lock:
+            self._playback_audio = audio
+            self._playback_position = 0
+            self._playback_done.clear()
+    
+    def _output_callback(self, outdata, frames, time_info, status) -> None:
+        """Feed the current sound to the output stream, padding with silence"""
+        count = 0
+        with self._playback_lock:
+            audio = self._playback_audio
+            if audio is not None:
+                start = self._playback_position
+                count = min(frames, len(audio) - start)
+                outdata[:count, 0] = audio[start:start + count]
+                self._playback_position = start + count
+                if self._playback_position == len(audio):
+                    self._playback_audio = None
+                    self._playback_done.set()
+        outdata[count:] = 0
+    
+    def close(self) -> None:
+        """Stop and close the persistent audio streams, if they were opened"""
+        self.stop_current_note()
+        if self._output_stream is not None:
+            self._output_stream.stop()
+            self._output_stream.close()
+            self._output_stream = None
+        if self._input_stream is not None:
+            self._input_stream.stop()
+            self._input_stream.close()
+            self._input_stream = None
+    
     def stop_current_note(self) -> None:
         """Stop the currently playing note if any"""
-        if self._is_playing and self._current_stream is not None:
-            sd.stop()
-            self._is_playing = False
-            self._current_stream = None
+        with self._playback_lock:
+            self._playback_audio = None
+            self._playback_done.set()
             
     def is_note_playing(self) -> bool:
         """Check if a note is currently playing"""
-        return self._is_playing
+        return not self._playback_done.is_set()
         
-    def check_for_keypress(self) -> Optional[str]:
+    def _input_callback(self, indata, frames, time_info, status) -> None:
+        """Queue microphone blocks from the input stream while recording"""
+        if self._capturing.is_set():
+            self._input_blocks.put(indata[:, 0].copy())
+    
+    @contextmanager
+    def _capture(self) -> Iterator[queue.Queue]:
         """
-        Check for a keypress without blocking. Returns the key if pressed, None otherwise.
-        This is a non-blocking version of _get_key_press.
+        Capture microphone input for the duration of the with block.
+        
+        The input stream is opened on first use and then left running, so
+        capture starts with the next block instead of waiting for PortAudio
+        to open a device.
+        
+        Yields:
+            Queue receiving each captured block as a 1-D float32 array
         """
-        import sys
-        import tty
-        import termios
-        import select
-        
-        # Check if there's input available
-        if select.select([sys.stdin], [], [], 0)[0]:
-            fd = sys.stdin.fileno()
-            old_settings = termios.tcgetattr(fd)
-            try:
-                tty.setraw(sys.stdin.fileno())
-                ch = sys.stdin.read(1)
-                # Handle arrow keys (they send 3 characters)
-                if ch == '\x1b':
-                    ch2 = sys.stdin.read(1)
-                    if ch2 == '[':
-                        ch3 = sys.stdin.read(1)
-                        if ch3 == 'A':
-                            return 'up'
-                        elif ch3 == 'B':
-                            return 'down'
-                return ch
-            finally:
-                termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-        return None
-
+        if self._input_stream is None:
+            self._input_stream = sd.InputStream(samplerate=self.sample_rate, channels=1, dtype='float32',
+                                                blocksize=STREAM_BLOCKSIZE, callback=self._input_callback)
+            self._input_stream.start()
+        
+        # Discard anything left over from the previous recording
+        while not self._input_blocks.empty():
+            self._input_blocks.get_nowait()
+        
+        self._capturing.set()
+        try:
+            yield self._input_blocks
+        finally:
+            self._capturing.clear()
+    
+    def _next_block(self, blocks: queue.Queue) -> np.ndarray:
+        """
+        Take the next captured block from a _capture() queue.
+        
+        Raises:
+            RuntimeError: If the microphone stopped delivering audio (device
+                error or unplugged). The input stream is closed so the next
+                recording opens it again.
+        """
+        try:
+            return blocks.get(timeout=STREAM_TIMEOUT_BLOCKS * STREAM_BLOCKSIZE / self.sample_rate)
+        except queue.Empty:
+            if self._input_stream is not None:
+                stream, self._input_stream = self._input_stream, None
+                stream.close()
+            raise RuntimeError("No audio received from the microphone") from None
+    
     def record_audio(self, duration: float = 3.0) -> np.ndarray:
         """
         Record audio for the specified duration.
@@ -115,6 +294,9 @@ class AudioPlayer:
             
         Returns:
             Recorded audio as numpy array
+            
+        Raises:
+            RuntimeError: If the microphone stops delivering audio
         """
         print(f"Recording for {duration} seconds... Speak or play now!")
         
@@ -122,17 +304,146 @@ class AudioPlayer:
         self.play_click_sound()
         
         # Record audio
-        audio = sd.rec(int(duration * self.sample_rate), 
-                      samplerate=self.sample_rate, 
-                      channels=1)
-        sd.wait()  # Wait until recording is finished
+        audio = np.zeros(int(duration * self.sample_rate), dtype=np.float32)
+        recorded = 0
+        with self._capture() as blocks:
+            # Blocks queue up in the background, so warm up pitch detection first
+            self._warm_up_pitch_detection()
+            
+            while recorded < len(audio):
+                block = self._next_block(blocks)
+                count = min(len(block), len(audio) - recorded)
+                audio[recorded:recorded + count] = block[:count]
+                recorded += count
         
-        return audio.flatten()
+        return audio
+    
+    def record_until_stable(self, duration: float = 3.0, tolerance_cents: float = 50.0,
+                            debug: bool = False) -> Optional[float]:
+        """
+        Record for up to the specified duration, stopping as soon as the pitch is steady.
+        
+        Pitch is estimated on the most recent analysis frame while recording.
+        When several consecutive estimates agree (within tolerance_cents of each
+        other) recording stops early. Otherwise the pitch of the whole
+        recording is detected once it has finished.
+        
+        Args:
+            duration: Maximum recording duration in seconds
+            tolerance_cents: How closely consecutive estimates must agree
+            debug: If True, print debug information
+            
+        Returns:
+            Detected frequency in Hz, or None if no clear pitch detected
+            
+        Raises:
+            RuntimeError: If the microphone stops delivering audio
+        """
+        print(f"Recording for up to {duration} seconds... Speak or play now!")
+        
+        # Play click sound to indicate recording start
+        self.play_click_sound()
+        
+        frame_length = self._frame_size * self._decimation
+        audio = np.zeros(int(duration * self.sample_rate), dtype=np.float32)
+        recorded = 0
+        block_count = 0
+        estimates = []
+        
+        with self._capture() as blocks:
+            # Blocks queue up in the background, so warm up pitch detection first
+            self._warm_up_pitch_detection()
+
+            while recorded < len(audio):
+                block = self._next_block(blocks)
+                count = min(len(block), len(audio) - recorded)
+                audio[recorded:recorded + count] = block[:count]
+                recorded += count
+                block_count += 1
+                
+                if recorded < frame_length or block_count % ESTIMATE_EVERY_BLOCKS:
+                    continue
+                
+                detected_freq = self.detect_pitch(audio[recorded - frame_length:recorded])
+                if detected_freq is None:
+                    estimates = []
+                    continue
+                if estimates and not is_note_close(estimates[-1], detected_freq, tolerance_cents):
+                    estimates = []
+                estimates.append(detected_freq)
+                
+                if len(estimates) == STABLE_ESTIMATES:
+                    stable_freq = float(np.median(estimates))
+                    if debug:
+                        print(f"Debug: Pitch stable at {stable_freq:.1f} Hz after {recorded / self.sample_rate:.2f} s")
+                    return stable_freq
+        
+        return self.detect_pitch(audio, debug=debug)
+    
+    def _warm_up_pitch_detection(self) -> None:
+        """Run pitch detection once on a test tone so the FFT plans are ready"""
+        if not self._pitch_detection_warm:
+            self.detect_pitch(generate_sine_wave(440.0, self._frame_size * self._decimation / self.sample_rate,
+                                                 self.sample_rate))
+            self._pitch_detection_warm = True
+    
+    def _normalized_difference(self, frame: np.ndarray, max_lag: int) -> np.ndarray:
+        """
+        Compute YIN's cumulative mean normalised difference function.
+        
+        The difference d(tau) = sum_j (x_j - x_{j+tau})^2 over a window of
+        len(frame) - max_lag samples is expanded into energy terms and a
+        cross-correlation, and the cross-correlation for every lag is obtained
+        from FFTs (Wiener-Khinchin) rather than a lag-by-lag loop.
+        
+        Args:
+            frame: Analysis frame
+            max_lag: Largest lag to evaluate
+            
+        Returns:
+            d'(tau) for tau = 0..max_lag
+        """
+        fft = _scipy_fft()
+        
+        window = len(frame) - max_lag
+        
+        # Cross-correlation r(tau) = sum_{j < window} x_j x_{j+tau}. The
+        # first window samples only ever reach index window + max_lag - 1 =
+        # len(frame) - 1, so a transform of len(frame) points cannot wrap around.
+        # Full frames use the cached power-of-two size; shorter recordings are
+        # padded only up to the next length pocketfft handles efficiently
+        # (a product of small primes), which is often well below the next
+        # power of two.
+        if len(frame) == self._frame_size:
+            fft_size = self._frame_size
+        else:
+            fft_size = fft.next_fast_len(len(frame), real=True)
+        cross_spectrum = fft.rfft(frame[:window], fft_size, workers=-1)
+        np.conjugate(cross_spectrum, out=cross_spectrum)
+        cross_spectrum *= fft.rfft(frame, fft_size, workers=-1)
+        correlation = fft.irfft(cross_spectrum, fft_size, workers=-1)[:max_lag + 1]
+        
+        # Energy of each window: sum_{j < window} x_{j+tau}^2
+        cumulative_energy = np.concatenate(([0.0], np.cumsum(np.square(frame, dtype=np.float64))))
+        lags = np.arange(max_lag + 1)
+        window_energy = cumulative_energy[lags + window] - cumulative_energy[lags]
+        
+        difference = window_energy[0] + window_energy - 2 * correlation
+        difference[0] = 0.0
+        
+        # Normalise each lag by the mean difference up to that lag
+        normalized = np.ones(max_lag + 1)
+        running_total = np.cumsum(difference[1:])
+        normalized[1:] = difference[1:] * lags[1:] / np.maximum(running_total, np.finfo(np.float64).tiny)
+        return normalized
     
     def detect_pitch(self, audio: np.ndarray, min_freq: float = 200.0, max_freq: float = 900.0, debug: bool = False) -> Optional[float]:
         """
-        Detect the fundamental frequency (pitch) using FFT-based analysis.
-        Optimized for violin notes with harmonic correction.
+        Detect the fundamental frequency (pitch) using the YIN algorithm.
+        
+        YIN picks the shortest period at which the signal closely matches a
+        delayed copy of itself. Unlike picking the strongest spectral peak, a
+        strong second harmonic does not make it report the wrong octave.
         
         Args:
             audio: Audio samples as numpy array
@@ -147,121 +458,67 @@ class AudioPlayer:
             return None
             
         try:
-            # Use a larger window for better frequency resolution
-            # Pad the audio to ensure we have enough samples
-            target_length = 8192  # Larger FFT for better resolution
-            if len(audio) < target_length:
-                # Pad with zeros if audio is too short
-                padded_audio = np.pad(audio, (0, target_length - len(audio)), 'constant')
-            else:
-                # Take the middle portion if audio is longer
-                start = len(audio) // 2 - target_length // 2
-                padded_audio = audio[start:start + target_length]
-            
-            # Apply a window function to reduce spectral leakage
-            window = signal.windows.hann(len(padded_audio))
-            audio_windowed = padded_audio * window
+            # Work in single precision throughout; rfft then returns complex64
+            audio = np.asarray(audio, dtype=np.float32)
             
-            # Compute FFT
-            fft = np.fft.rfft(audio_windowed)
-            freqs = np.fft.rfftfreq(len(padded_audio), 1.0 / self.sample_rate)
+            # Take the middle portion if audio is longer than one analysis
+            # frame, before doing any other work on it
+            frame_length = self._frame_size * self._decimation
+            if len(audio) > frame_length:
+                start = len(audio) // 2 - frame_length // 2
+                audio = audio[start:start + frame_length]
             
-            # Get magnitude spectrum
-            magnitude = np.abs(fft)
+            # Decimate to the analysis rate
+            frame = audio[::self._decimation]
             
-            # Find frequency range of interest (extend range for harmonic detection)
-            extended_min_freq = min_freq * 0.5  # Allow detection of lower harmonics
-            extended_max_freq = max_freq * 2.0   # Allow detection of higher harmonics
-            freq_mask = (freqs >= extended_min_freq) & (freqs <= extended_max_freq)
-            freqs_of_interest = freqs[freq_mask]
-            magnitude_of_interest = magnitude[freq_mask]
+            # Lags (periods in samples) covering the requested frequency range,
+            # plus one either side for interpolation
+            min_lag = max(int(self._analysis_rate / max_freq), 2)
+            max_lag = int(np.ceil(self._analysis_rate / min_freq)) + 1
             
             if debug:
-                print(f"Debug: Audio length: {len(audio)}, Padded length: {len(padded_audio)}")
-                print(f"Debug: Frequency range: {extended_min_freq:.1f} - {extended_max_freq:.1f} Hz")
-                print(f"Debug: Max magnitude: {np.max(magnitude_of_interest):.2f}")
+                print(f"Debug: Audio length: {len(frame)}, Lag range: {min_lag} - {max_lag}")
             
-            if len(freqs_of_interest) == 0:
+            # Need at least a full period of the lowest note beyond the largest lag
+            if len(frame) - max_lag < max_lag:
+                if debug:
+                    print("Debug: Audio too short for the requested frequency range")
                 return None
             
-            # Find peaks in the magnitude spectrum with more lenient threshold
-            peaks, properties = signal.find_peaks(
-                magnitude_of_interest, 
-                height=np.max(magnitude_of_interest) * 0.05,  # Lower threshold
-                distance=10  # Minimum distance between peaks
-            )
-            
-            if debug:
-                print(f"Debug: Found {len(peaks)} peaks")
-                for i, peak_idx in enumerate(peaks[:5]):  # Show top 5 peaks
-                    freq = freqs_of_interest[peak_idx]
-                    mag = magnitude_of_interest[peak_idx]
-                    print(f"Debug: Peak {i+1}: {freq:.1f} Hz, magnitude: {mag:.2f}")
-            
-            if len(peaks) == 0:
+            # Silence has no pitch (and would make the difference function 0/0)
+            if not np.any(frame):
+                if debug:
+                    print("Debug: Silence")
                 return None
             
-            # Sort peaks by magnitude (highest first)
-            peak_magnitudes = magnitude_of_interest[peaks]
-            sorted_indices = np.argsort(peak_magnitudes)[::-1]
-            sorted_peaks = peaks[sorted_indices]
+            normalized = self._normalized_difference(frame, max_lag)
             
-            # Check each peak, starting with the strongest
-            for peak_idx in sorted_peaks:
-                detected_freq = freqs_of_interest[peak_idx]
-                peak_magnitude = magnitude_of_interest[peak_idx]
-                avg_magnitude = np.mean(magnitude_of_interest)
-                
-                if debug:
-                    print(f"Debug: Checking peak at {detected_freq:.1f} Hz, magnitude: {peak_magnitude:.2f}, avg: {avg_magnitude:.2f}")
-                
-                # Only consider peaks significantly above the average
-                if peak_magnitude < avg_magnitude * 1.5:
+            # Absolute threshold: take the first dip below YIN_THRESHOLD and
+            # follow it down to its local minimum. Failing that, fall back to
+            # the best lag in range if the signal is periodic enough.
+            lag = _first_dip(normalized, min_lag, max_lag, YIN_THRESHOLD)
+            if lag is None:
+                lag = min_lag + np.argmin(normalized[min_lag:max_lag])
+                if normalized[lag] > YIN_MAX_APERIODICITY:
                     if debug:
-                        print(f"Debug: Peak too weak, skipping")
-                    continue
-                
-                # Check if this frequency is in our target range
-                if min_freq <= detected_freq <= max_freq:
-                    if debug:
-                        print(f"Debug: Found valid frequency: {detected_freq:.1f} Hz")
-                    return float(detected_freq)
-                
-                # Harmonic correction: check if this is half the target frequency
-                # This handles cases where the fundamental is weak but the first harmonic is strong
-                for target_freq in [440.0, 493.9, 554.4, 587.3, 659.3, 740.0, 830.6, 880.0]:  # Our A major scale
-                    if abs(detected_freq - target_freq/2) < 10:  # Within 10 Hz of half frequency
-                        # Check if the second harmonic (target_freq) is also present
-                        harmonic_idx = np.argmin(np.abs(freqs_of_interest - target_freq))
-                        if harmonic_idx < len(magnitude_of_interest):
-                            harmonic_magnitude = magnitude_of_interest[harmonic_idx]
-                            if debug:
-                                print(f"Debug: Potential harmonic: {detected_freq:.1f} Hz -> {target_freq:.1f} Hz, harmonic magnitude: {harmonic_magnitude:.2f}")
-                            # If the harmonic is also strong, return the target frequency
-                            if harmonic_magnitude > avg_magnitude * 1.0:
-                                if debug:
-                                    print(f"Debug: Harmonic correction applied: {target_freq:.1f} Hz")
-                                return float(target_freq)
-                
-                # If we're looking for high notes (like A5 = 880 Hz) and detect a lower frequency
-                # that's close to half the target, it might be an octave error
-                if detected_freq < max_freq * 0.6:  # If detected frequency is much lower
-                    for target_freq in [740.0, 830.6, 880.0]:  # High notes in our scale
-                        if abs(detected_freq - target_freq/2) < 20:  # Within 20 Hz of half
-                            # Check if the target frequency has a strong peak
-                            target_idx = np.argmin(np.abs(freqs_of_interest - target_freq))
-                            if target_idx < len(magnitude_of_interest):
-                                target_magnitude = magnitude_of_interest[target_idx]
-                                if debug:
-                                    print(f"Debug: Octave error check: {detected_freq:.1f} Hz -> {target_freq:.1f} Hz, target magnitude: {target_magnitude:.2f}")
-                                if target_magnitude > avg_magnitude * 0.8:
-                                    if debug:
-                                        print(f"Debug: Octave error correction applied: {target_freq:.1f} Hz")
-                                    return float(target_freq)
+                        print(f"Debug: No periodicity found (best difference {normalized[lag]:.3f})")
+                    return None
+            
+            # Parabolic interpolation around the minimum for sub-sample precision
+            before, at, after = normalized[lag - 1], normalized[lag], normalized[lag + 1]
+            curvature = before - 2 * at + after
+            shift = 0.5 * (before - after) / curvature if curvature > 0 else 0.0
+            detected_freq = self._analysis_rate / (lag + shift)
             
             if debug:
-                print("Debug: No valid pitch found")
-            return None
+                print(f"Debug: Period {lag + shift:.2f} samples, difference {at:.3f} -> {detected_freq:.1f} Hz")
+            
+            if not min_freq <= detected_freq <= max_freq:
+                if debug:
+                    print("Debug: No valid pitch found")
+                return None
+            
+            return float(detected_freq)
                 
         except Exception as e:
             print(f"Error detecting pitch: {e}")
@@ -274,26 +531,23 @@ class AudioPlayer:
         
         Args:
             target_frequency: Expected frequency in Hz
-            duration: Recording duration in seconds
+            duration: Maximum recording duration in seconds
             tolerance_cents: Tolerance in cents
             debug: If True, show detailed pitch detection info
             
         Returns:
             Tuple of (success, detected_frequency)
         """
-        # Record audio
-        audio = self.record_audio(duration)
-        
-        # Detect pitch
-        detected_freq = self.detect_pitch(audio, debug=debug)
+        # Record until the pitch settles (or the duration runs out) and detect it
+        detected_freq = self.record_until_stable(duration, tolerance_cents, debug=debug)
         
         if debug:
             print(f"Debug: Target frequency: {target_frequency:.1f} Hz")
             print(f"Debug: Detected frequency: {detected_freq:.1f} Hz" if detected_freq else "Debug: No pitch detected")
             if detected_freq:
-                cents_diff = 1200 * np.log2(detected_freq / target_frequency)
-                print(f"Debug: Cents difference: {cents_diff:.1f}")
-                print(f"Debug: Within tolerance ({tolerance_cents} cents): {abs(cents_diff) <= tolerance_cents}")
+                cents = cents_diff(target_frequency, detected_freq)
+                print(f"Debug: Cents difference: {cents:.1f}")
+                print(f"Debug: Within tolerance ({tolerance_cents} cents): {abs(cents) <= tolerance_cents}")
         
         if detected_freq is None:
             print("No clear pitch detected. Please try again!")
@@ -311,67 +565,85 @@ class AudioPlayer:
     
     def play_water_drop_sound(self) -> None:
         """Play a water drop rising and decaying sound for correct pitches"""
+        self.play_audio(self._water_drop_sound)
+    
+    def play_click_sound(self) -> None:
+        """Play a click sound when recording starts"""
+        self.play_audio(self._click_sound)
+    
+    def _make_water_drop_sound(self) -> np.ndarray:
+        """Synthesise the water drop sound played by play_water_drop_sound()"""
         # Create a water drop sound with rising frequency that decays quickly
         duration = 0.4  # Reduced from 0.8 to 0.4 seconds
         sample_rate = self.sample_rate
         
-        t = np.linspace(0, duration, int(sample_rate * duration), False)
+        t = np.linspace(0, duration, int(sample_rate * duration), False, dtype=np.float32)
         
         # Start at a low frequency and rise to a higher frequency
         start_freq = 400  # Hz
         end_freq = 1200   # Hz
         
         # Create a frequency sweep (rising)
-        freq_sweep = np.linspace(start_freq, end_freq, len(t))
+        freq_sweep = np.linspace(start_freq, end_freq, len(t), dtype=np.float32)
         
-        # Generate the rising tone
-        rising_tone = np.sin(2 * np.pi * freq_sweep * t)
+        # Phase of the rising tone; the harmonics are multiples of it
+        phase = 2 * np.pi * freq_sweep * t
         
-        # Apply envelope: quick attack, very fast decay
-        envelope = np.ones_like(t)
+        # Envelope: quick attack, very fast decay
+        envelope = np.empty_like(t)
         attack_samples = int(0.05 * sample_rate)  # 0.05 second attack (reduced)
         decay_samples = int(0.35 * sample_rate)   # 0.35 second decay (reduced)
         
         # Quick attack
-        envelope[:attack_samples] = np.linspace(0, 1, attack_samples)
+        envelope[:attack_samples] = np.linspace(0, 1, attack_samples, dtype=np.float32)
         # Very fast decay
         envelope[attack_samples:] = np.exp(-8 * (t[attack_samples:] - t[attack_samples]) / (t[-1] - t[attack_samples]))  # Increased decay rate
         
-        # Apply envelope and add some harmonics for richness
-        water_drop = rising_tone * envelope
-        water_drop += 0.3 * np.sin(2 * np.pi * freq_sweep * 2 * t) * envelope  # Second harmonic
-        water_drop += 0.1 * np.sin(2 * np.pi * freq_sweep * 3 * t) * envelope  # Third harmonic
-        
-        # Normalize and play
-        water_drop = water_drop * 0.2  # Reduce volume
-        sd.play(water_drop, sample_rate)
-        sd.wait()
+        # Sum the tone and some harmonics for richness in one buffer, then
+        # apply the envelope and volume (reduced to 0.2) in a single multiply
+        # sin(x) + 0.3 sin(2x) + 0.1 sin(3x), with the harmonics expanded as
+        # sin(2x) = 2 sin(x) cos(x) and sin(3x) = sin(x) (3 - 4 sin(x)^2) so
+        # only one sine and one cosine are evaluated:
+        # sin(x) (1.3 + 0.6 cos(x) - 0.4 sin(x)^2)
+        sine = np.sin(phase)
+        water_drop = np.cos(phase)
+        water_drop *= 0.6
+        water_drop += 1.3
+        water_drop -= 0.4 * np.square(sine)
+        water_drop *= sine
+        envelope *= 0.2
+        water_drop *= envelope
+        
+        water_drop.setflags(write=False)
+        return water_drop
     
-    def play_click_sound(self) -> None:
-        """Play a click sound when recording starts"""
+    def _make_click_sound(self) -> np.ndarray:
+        """Synthesise the click sound played by play_click_sound()"""
         # Create a short click sound using noise
         duration = 0.05  # Very short click
         sample_rate = self.sample_rate
         
-        t = np.linspace(0, duration, int(sample_rate * duration), False)
+        t = np.linspace(0, duration, int(sample_rate * duration), False, dtype=np.float32)
         
-        # Create a click using white noise instead of a pitched tone
-        click = np.random.normal(0, 1, len(t))
+        # Create a click using white noise instead of a pitched tone. A fixed
+        # seed gives the same click every run, and the Generator can produce
+        # float32 directly.
+        click = np.random.default_rng(0).standard_normal(len(t), dtype=np.float32)
         
         # Apply envelope: very quick attack and decay
-        envelope = np.ones_like(t)
+        envelope = np.empty_like(t)
         attack_samples = int(0.005 * sample_rate)  # 0.005 second attack
         decay_samples = int(0.045 * sample_rate)   # 0.045 second decay
         
         # Quick attack
-        envelope[:attack_samples] = np.linspace(0, 1, attack_samples)
+        envelope[:attack_samples] = np.linspace(0, 1, attack_samples, dtype=np.float32)
         # Quick decay
         envelope[attack_samples:] = np.exp(-15 * (t[attack_samples:] - t[attack_samples]) / (t[-1] - t[attack_samples]))
         
         # Apply envelope
         click = click * envelope
         
-        # Normalize and play
+        # Normalize
         click = click * 0.1  # Reduce volume
-        sd.play(click, sample_rate)
-        sd.wait() 
\ No newline at end of file
+        click.setflags(write=False)
+        return click 
\ No newline at end of file
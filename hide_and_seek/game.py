@@ -2,13 +2,32 @@
 Main game logic for Hide and Seek ear training
 """
 
-import random
 import time
+from functools import lru_cache
 from typing import List, Tuple, Optional
-from .notes import get_violin_range_notes
+from .notes import cents_diff, get_violin_range_notes
 from .audio import AudioPlayer
 import numpy as np
-import sounddevice as sd
+
+# Celebration melody: A B C# D E E E E F# D A(high) F# E(long), as
+# parallel arrays of note frequencies and durations, with a short pause
+# after each note
+CELEBRATION_FREQUENCIES = np.array([
+    440.0, 493.9, 554.4, 587.3,    # A4 B4 C#5 D5
+    659.3, 659.3, 659.3, 659.3,    # E5 E5 E5 E5
+    740.0, 587.3, 880.0, 740.0,    # F#5 D5 A5 (high) F#5
+    659.3,                         # E5 (long)
+])
+CELEBRATION_DURATIONS = np.array([0.1] * 12 + [0.5])
+CELEBRATION_NOTE_GAP = 0.1
+CELEBRATION_NOTE_FADE = 0.005
+
+@lru_cache(maxsize=4)
+def _fade_in_ramp(fade_samples: int) -> np.ndarray:
+    """Linear 0 -> 1 fade-in ramp (read-only; reverse it for a fade-out)"""
+    ramp = np.linspace(0, 1, fade_samples, dtype=np.float32)
+    ramp.setflags(write=False)
+    return ramp
 
 class HideAndSeekGame:
     """Main game class for the ear training app"""
@@ -18,8 +37,15 @@ class HideAndSeekGame:
         self.tolerance_cents = tolerance_cents
         self.debug = debug
         self.available_notes = get_violin_range_notes()
+        # Offset of every playable note from A4 in cents, in the same order as
+        # available_notes, so the nearest note to a detected pitch needs only
+        # one logarithm
+        self._note_cents = np.array([cents_diff(440.0, freq) for _, freq in self.available_notes])
+        self._rng = np.random.default_rng()
+        self._cheering_buffers = None
         self.score = 0
         self.total_attempts = 0
+        self._celebration_melody = self._render_celebration_melody()
         
     def select_random_notes(self, count: int) -> List[Tuple[str, float]]:
         """
@@ -31,7 +57,9 @@ class HideAndSeekGame:
         Returns:
             List of (note_name, frequency) tuples
         """
-        return random.sample(self.available_notes, min(count, len(self.available_notes)))
+        count = min(count, len(self.available_notes))
+        indices = self._rng.choice(len(self.available_notes), size=count, replace=False)
+        return [self.available_notes[i] for i in indices]
     
     def generate_note_sequence(self, distinct_notes: List[Tuple[str, float]], sequence_length: int) -> List[Tuple[str, float]]:
         """
@@ -51,17 +79,58 @@ class HideAndSeekGame:
             # If only one distinct note, we can't avoid repetition
             return [distinct_notes[0]] * sequence_length
         
-        sequence = []
-        last_note = None
+        note_count = len(distinct_notes)
+        
+        # Stepping cyclically forward by 1 to n-1 places from the previous note
+        # lands uniformly on any of the other notes, so the whole sequence comes
+        # from one batch of random offsets (the first "offset" picks any note)
+        offsets = self._rng.integers(1, note_count, size=sequence_length)
+        offsets[0] = self._rng.integers(note_count)
+        indices = np.cumsum(offsets) % note_count
         
-        for _ in range(sequence_length):
-            # Filter out the last note to avoid consecutive repeats
-            available_notes = [note for note in distinct_notes if note != last_note]
-            selected_note = random.choice(available_notes)
-            sequence.append(selected_note)
-            last_note = selected_note
+        return [distinct_notes[index] for index in indices.tolist()]
+    
+    def closest_note(self, frequency: float) -> Tuple[str, float]:
+        """
+        Find the available note closest to a frequency.
+        
+        Args:
+            frequency: Frequency in Hz
+            
+        Returns:
+            Tuple of (note_name, cents) where cents is how far the frequency is
+            from that note
+        """
+        cents = cents_diff(440.0, frequency) - self._note_cents
+        best = int(np.argmin(np.abs(cents)))
+        return self.available_notes[best][0], float(cents[best])
+    
+    def _render_celebration_melody(self) -> np.ndarray:
+        """
+        Render the celebration melody, pauses included, into one buffer.
         
-        return sequence
+        Playing it with a single write avoids a play/sleep round trip per note.
+        Each note gets a short fade in and out so the joins don't click.
+        """
+        sample_rate = self.audio_player.sample_rate
+        gap_samples = int(CELEBRATION_NOTE_GAP * sample_rate)
+        fade_in = _fade_in_ramp(int(CELEBRATION_NOTE_FADE * sample_rate))
+        
+        # Each note plus its pause occupies a slot; find where each one starts
+        # (note lengths rounded the same way generate_sine_wave rounds them)
+        slot_samples = np.rint(CELEBRATION_DURATIONS * sample_rate).astype(int) + gap_samples
+        note_starts = np.cumsum(slot_samples) - slot_samples
+        
+        # Write each note into place in the (silent) melody buffer and fade its ends
+        melody = np.zeros(slot_samples.sum(), dtype=np.float32)
+        for freq, duration, start in zip(CELEBRATION_FREQUENCIES.tolist(), CELEBRATION_DURATIONS.tolist(),
+                                         note_starts.tolist()):
+            note = self.audio_player.render_note(freq, duration=duration, volume=0.2)
+            segment = melody[start:start + len(note)]
+            segment[:] = note
+            segment[:len(fade_in)] *= fade_in
+            segment[-len(fade_in):] *= fade_in[::-1]
+        return melody
     
     def play_celebration(self) -> None:
         """Play a celebration sound when the game is completed"""
@@ -69,26 +138,8 @@ class HideAndSeekGame:
         print("You found all the hidden notes!")
         print("🎵🎵🎵🎵🎵🎵🎵🎵🎵🎵🎵🎵🎵🎵🎵🎵")
         
-        # Play the celebration melody: A B C# D E E E E F# D A(high) F# E(long)
-        celebration_notes = [
-            (440.0, 0.1),    # A4
-            (493.9, 0.1),    # B4
-            (554.4, 0.1),    # C#5
-            (587.3, 0.1),    # D5
-            (659.3, 0.1),    # E5
-            (659.3, 0.1),    # E5
-            (659.3, 0.1),    # E5
-            (659.3, 0.1),    # E5
-            (740.0, 0.1),    # F#5
-            (587.3, 0.1),    # D5
-            (880.0, 0.1),    # A5 (high)
-            (740.0, 0.1),    # F#5
-            (659.3, 0.5),    # E5 (long)
-        ]
-        
-        for freq, duration in celebration_notes:
-            self.audio_player.play_note(freq, duration=duration, volume=0.2)
-            time.sleep(0.1)
+        # Play the pre-rendered celebration melody
+        self.audio_player.play_audio(self._celebration_melody)
         
         print("\n🎵 You've been working hard on the A major scale! 🎵")
         time.sleep(1)
@@ -108,36 +159,45 @@ class HideAndSeekGame:
         duration = 2.0
         sample_rate = self.audio_player.sample_rate
         
-        # Generate cheering sound with random variations
-        # Create the base cheering sound
-        t = np.linspace(0, duration, int(sample_rate * duration), False)
-        cheering_sound = np.zeros_like(t)
-        
-        # Add multiple frequencies with random phases and amplitudes
-        for freq in cheering_frequencies:
-            # Random phase
-            phase = np.random.random() * 2 * np.pi
-            # Random amplitude (stronger for lower frequencies)
-            amplitude = np.random.random() * 0.1 * (4000 / freq)
-            # Add this frequency component
-            cheering_sound += amplitude * np.sin(2 * np.pi * freq * t + phase)
+        # Generate cheering sound with random variations. The time base and
+        # working buffers are allocated on the first call and reused after.
+        freqs = np.array(cheering_frequencies, dtype=np.float32)
+        if self._cheering_buffers is None:
+            num_samples = int(sample_rate * duration)
+            self._cheering_buffers = (
+                np.linspace(0, duration, num_samples, False, dtype=np.float32),  # time base
+                np.empty((len(freqs), num_samples), dtype=np.float32),          # partials
+                np.empty(num_samples, dtype=np.float32),                        # output
+                np.empty(num_samples, dtype=np.float32),                        # noise
+            )
+        t, partials, cheering_sound, noise = self._cheering_buffers
+        
+        # Add multiple frequencies with random phases and random amplitudes
+        # (stronger for lower frequencies). All partials are evaluated in one
+        # (frequencies x samples) sine call and summed with their weights.
+        phases = self._rng.random(len(freqs), dtype=np.float32) * np.float32(2 * np.pi)
+        amplitudes = self._rng.random(len(freqs), dtype=np.float32) * np.float32(0.1) * (4000 / freqs)
+        np.multiply((2 * np.pi * freqs)[:, None], t, out=partials)
+        partials += phases[:, None]
+        np.sin(partials, out=partials)
+        np.matmul(amplitudes, partials, out=cheering_sound)
         
         # Add some noise to make it sound more realistic
-        noise = np.random.normal(0, 0.05, len(cheering_sound))
+        self._rng.standard_normal(out=noise, dtype=np.float32)
+        noise *= 0.05
         cheering_sound += noise
         
-        # Apply envelope to make it fade in and out
-        envelope = np.ones_like(cheering_sound)
-        fade_samples = int(0.1 * sample_rate)  # 0.1 second fade
-        envelope[:fade_samples] = np.linspace(0, 1, fade_samples)
-        envelope[-fade_samples:] = np.linspace(1, 0, fade_samples)
+        # Normalize (reduce volume)
+        cheering_sound *= 0.3
         
-        cheering_sound *= envelope
+        # Fade in and out. Only the ends need scaling, so no full-length
+        # envelope is built.
+        fade_in = _fade_in_ramp(int(0.1 * sample_rate))  # 0.1 second fade
+        cheering_sound[:len(fade_in)] *= fade_in
+        cheering_sound[-len(fade_in):] *= fade_in[::-1]
         
-        # Normalize and play
-        cheering_sound = cheering_sound * 0.3  # Reduce volume
-        sd.play(cheering_sound, sample_rate)
-        sd.wait()
+        # Play
+        self.audio_player.play_audio(cheering_sound)
     
     def play_note_sequence(self, notes: List[Tuple[str, float]]) -> None:
         """
@@ -202,6 +262,9 @@ class HideAndSeekGame:
                 
                 return True
             else:
+                if self.debug and detected_freq is not None:
+                    closest_name, cents = self.closest_note(detected_freq)
+                    print(f"Debug: Closest note: {closest_name} ({cents:+.1f} cents)")
                 print("❌ Not quite right. Let me play it again...")
                 # The note will be played again in the next iteration of the loop
     
@@ -2,7 +2,9 @@
 Violin note definitions and utilities
 """
 
-from typing import List, Dict, Tuple
+import math
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
 import numpy as np
 
 # Violin string frequencies (open strings)
@@ -16,10 +18,16 @@ VIOLIN_STRINGS = {
 # Note names in order
 NOTE_NAMES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
 
+# Note name -> index (0-11) in NOTE_NAMES
+_NOTE_INDEX = {name: index for index, name in enumerate(NOTE_NAMES)}
+
+@lru_cache(maxsize=256)
 def get_note_frequency(note_name: str, octave: int = 4) -> float:
     """
     Calculate frequency for a given note name and octave.
     
+    Results are cached; there are only 12 note names and a handful of octaves.
+    
     Args:
         note_name: Note name (e.g., 'A', 'C#')
         octave: Octave number (4 is middle C)
@@ -28,17 +36,32 @@ def get_note_frequency(note_name: str, octave: int = 4) -> float:
         Frequency in Hz
     """
     # Find the note index (0-11)
-    note_index = NOTE_NAMES.index(note_name)
+    try:
+        note_index = _NOTE_INDEX[note_name]
+    except KeyError:
+        raise ValueError(f"Unknown note name: {note_name!r}") from None
     
     # Calculate frequency using A4 = 440Hz as reference
     # A4 is at index 9 in our note array
     semitones_from_a4 = note_index - 9 + (octave - 4) * 12
     
     # Calculate frequency using the formula: f = f0 * 2^(n/12)
-    frequency = 440.0 * (2 ** (semitones_from_a4 / 12))
+    frequency = 440.0 * math.exp2(semitones_from_a4 / 12)
     
     return frequency
 
+# A major scale notes between A4 and A5, computed once at import
+_VIOLIN_RANGE_NOTES = (
+    ('A4', 440.0),                           # A4 - 440 Hz
+    ('B4', get_note_frequency('B', 4)),      # B4 - ~493.9 Hz
+    ('C#5', get_note_frequency('C#', 5)),    # C#5 - ~554.4 Hz
+    ('D5', get_note_frequency('D', 5)),      # D5 - ~587.3 Hz
+    ('E5', get_note_frequency('E', 5)),      # E5 - ~659.3 Hz
+    ('F#5', get_note_frequency('F#', 5)),    # F#5 - ~740.0 Hz
+    ('G#5', get_note_frequency('G#', 5)),    # G#5 - ~830.6 Hz
+    ('A5', get_note_frequency('A', 5)),      # A5 - 880 Hz
+)
+
 def get_violin_range_notes() -> List[Tuple[str, float]]:
     """
     Get notes from A major scale between 440 Hz (A4) and 880 Hz (A5).
@@ -48,39 +71,127 @@ def get_violin_range_notes() -> List[Tuple[str, float]]:
     Returns:
         List of (note_name, frequency) tuples
     """
-    notes = []
-    
-    # A major scale notes - only those 440 Hz and above
-    a_major_scale_notes = [
-        ('A4', 440.0),      # A4 - 440 Hz
-        ('B4', get_note_frequency('B', 4)),      # B4 - ~493.9 Hz
-        ('C#5', get_note_frequency('C#', 5)),    # C#5 - ~554.4 Hz
-        ('D5', get_note_frequency('D', 5)),      # D5 - ~587.3 Hz
-        ('E5', get_note_frequency('E', 5)),      # E5 - ~659.3 Hz
-        ('F#5', get_note_frequency('F#', 5)),    # F#5 - ~740.0 Hz
-        ('G#5', get_note_frequency('G#', 5)),    # G#5 - ~830.6 Hz
-        ('A5', get_note_frequency('A', 5)),      # A5 - 880 Hz
-    ]
-    
-    # Add all notes
-    notes.extend(a_major_scale_notes)
-    
-    return notes
-
-def generate_sine_wave(frequency: float, duration: float, sample_rate: int = 44100) -> np.ndarray:
+    # Return a fresh list so callers can't modify the shared table
+    return list(_VIOLIN_RANGE_NOTES)
+
+# Sine waves are built by repeating a short wavetable holding a whole number
+# of cycles in a whole number of samples. The table's cycle count is chosen
+# so that its pitch is within WAVETABLE_TOLERANCE_CENTS of the requested one.
+WAVETABLE_TOLERANCE_CENTS = 0.1
+WAVETABLE_MAX_CYCLES = 64
+
+@lru_cache(maxsize=64)
+def _wavetable(frequency: float, sample_rate: int) -> Optional[np.ndarray]:
+    """
+    Find the shortest loopable wavetable for a frequency.
+    
+    Returns:
+        Read-only float32 table, or None if the frequency is not positive or
+        no table of up to WAVETABLE_MAX_CYCLES cycles is close enough in pitch
+    """
+    if frequency <= 0:
+        return None
+    
+    period = sample_rate / frequency
+    max_error = math.pow(2.0, WAVETABLE_TOLERANCE_CENTS / 1200) - 1
+    for cycles in range(1, WAVETABLE_MAX_CYCLES + 1):
+        length = round(cycles * period)
+        if length and abs(length - cycles * period) <= cycles * period * max_error:
+            # Exact integer phase: sample i is (i * cycles mod length) / length
+            # of the way through a cycle, so the table loops seamlessly
+            phase = np.arange(length) * cycles % length * (2 * np.pi / length)
+            table = np.sin(phase).astype(np.float32)
+            table.setflags(write=False)
+            return table
+    return None
+
+@lru_cache(maxsize=64)
+def _sine_wave(frequency: float, duration: float, sample_rate: int, amplitude: float,
+               dtype: np.dtype) -> np.ndarray:
+    """Compute a sine wave once per (frequency, duration, sample_rate, amplitude, dtype)"""
+    # Round rather than truncate: 0.35 s * 44100 Hz is 15434.999..., not 15435
+    sample_count = round(sample_rate * duration)
+    table = _wavetable(frequency, sample_rate)
+    if table is not None and len(table) < sample_count:
+        # Copying the table is ~20x faster than evaluating sin per sample
+        wave = np.resize(table, sample_count)
+    else:
+        # Evaluate sin in float32 (half the bandwidth of float64), but wrap the
+        # phase to a single cycle in float64 first: a raw float32 phase reaches
+        # ~1e4 radians on a two-second A5 and drifts by ~1e-3, while the
+        # wrapped phase stays within ~1e-7 of the exact wave.
+        cycles = np.arange(sample_count, dtype=np.float64)
+        cycles *= frequency / sample_rate
+        cycles -= np.floor(cycles)
+        cycles *= 2 * np.pi
+        wave = cycles.astype(np.float32)
+        np.sin(wave, out=wave)
+    if dtype == np.int16:
+        # 16-bit PCM: full scale is 32767, rounded once on the way out
+        np.multiply(wave, np.float32(32767.0 * amplitude), out=wave)
+        wave = np.rint(wave, out=wave).astype(np.int16)
+    elif amplitude != 1.0:
+        np.multiply(wave, np.float32(amplitude), out=wave)
+    wave.setflags(write=False)
+    return wave
+
+def generate_sine_wave(frequency: float, duration: float, sample_rate: int = 44100,
+                       amplitude: float = 1.0, dtype=np.float32) -> np.ndarray:
     """
     Generate a sine wave for a given frequency and duration.
     
+    The same few notes are generated over and over, so waves are cached. The
+    returned array is shared between callers and therefore read-only; copy it
+    before modifying it in place.
+    
+    Waves are usually built by looping a short table that holds a whole number
+    of cycles in a whole number of samples, so the pitch actually produced can
+    differ from the requested one by up to WAVETABLE_TOLERANCE_CENTS (0.1
+    cent). Such a wave is an exact sine at that slightly different pitch, so it
+    slowly drifts out of phase with the exact wave at the requested frequency:
+    after two seconds at 44.1 kHz samples can differ by ~0.3 at 440 Hz and by
+    up to ~1 at 1760 Hz. This is far below what can be heard, but it also
+    means a detune smaller than 0.1 cent (Scale Detective accepts any
+    positive --cents) may not be present in the generated wave at all.
+    
     Args:
         frequency: Frequency in Hz
         duration: Duration in seconds
         sample_rate: Sample rate in Hz
+        amplitude: Peak amplitude of the wave (1.0 is full scale)
+        dtype: np.float32, or np.int16 for 16-bit PCM samples
     
     Returns:
-        Audio samples as numpy array
+        Audio samples as a numpy array of the requested dtype
     """
-    t = np.linspace(0, duration, int(sample_rate * duration), False)
-    return np.sin(2 * np.pi * frequency * t)
+    dtype = np.dtype(dtype)
+    if dtype != np.float32 and dtype != np.int16:
+        raise ValueError(f"Unsupported sample dtype: {dtype}")
+    return _sine_wave(frequency, duration, sample_rate, amplitude, dtype)
+
+# 1200 * log2(r) == _CENTS_PER_NEPER * ln(r)
+_CENTS_PER_NEPER = 1200.0 / math.log(2.0)
+
+def cents_diff(frequency1: float, frequency2: float) -> float:
+    """
+    Calculate how far frequency2 is from frequency1 in cents.
+    
+    Args:
+        frequency1: Reference frequency in Hz
+        frequency2: Frequency to compare in Hz
+    
+    Returns:
+        Signed distance in cents (positive if frequency2 is sharp)
+    """
+    # log1p of the relative difference keeps full precision for the nearly
+    # equal frequencies this is used on, and is a little cheaper than log2
+    return _CENTS_PER_NEPER * math.log1p((frequency2 - frequency1) / frequency1)
+
+@lru_cache(maxsize=8)
+def _tolerance_ratios(tolerance_cents: float) -> Tuple[float, float]:
+    """Frequency ratio bounds (low, high) equivalent to a tolerance in cents"""
+    max_ratio = math.pow(2.0, tolerance_cents / 1200)
+    return 1 / max_ratio, max_ratio
 
 def is_note_close(frequency1: float, frequency2: float, tolerance_cents: float = 50.0) -> bool:
     """
@@ -97,6 +208,36 @@ def is_note_close(frequency1: float, frequency2: float, tolerance_cents: float =
     if frequency1 <= 0 or frequency2 <= 0:
         return False
     
-    # Calculate cents difference
-    cents_diff = 1200 * np.log2(frequency2 / frequency1)
-    return abs(cents_diff) <= tolerance_cents 
\ No newline at end of file
+    # |1200 * log2(f2 / f1)| <= tolerance is the same as f2 / f1 lying between
+    # 2^(-tolerance/1200) and 2^(tolerance/1200), which needs no logarithm
+    min_ratio, max_ratio = _tolerance_ratios(tolerance_cents)
+    ratio = frequency2 / frequency1
+    return min_ratio <= ratio <= max_ratio
+
+def is_note_close_vec(reference_frequency: float, frequencies: np.ndarray,
+                      tolerance_cents: float = 50.0) -> np.ndarray:
+    """
+    Check many frequencies against one reference at once.
+    
+    Vectorized form of is_note_close(reference_frequency, f, tolerance_cents)
+    for every f in frequencies.
+    
+    Args:
+        reference_frequency: Reference frequency in Hz
+        frequencies: Array of frequencies in Hz to compare against it
+        tolerance_cents: Tolerance in cents (1 semitone = 100 cents)
+    
+    Returns:
+        Boolean array, True where the frequency is within tolerance
+    """
+    frequencies = np.asarray(frequencies, dtype=np.float64)
+    # Written so that a NaN reference also fails the check
+    if not 0 < reference_frequency < math.inf:
+        return np.zeros(frequencies.shape, dtype=bool)
+    
+    # Same ratio-bounds test as is_note_close, with no per-element branch:
+    # zero, negative, infinite and NaN frequencies all give a ratio outside
+    # the bounds, and no logarithm is taken, so they need no mask.
+    min_ratio, max_ratio = _tolerance_ratios(tolerance_cents)
+    ratios = frequencies / reference_frequency
+    return (ratios >= min_ratio) & (ratios <= max_ratio)
@@ -2,15 +2,53 @@
 Scale Detective - A game to detect out-of-tune notes in an A major scale
 """
 
+import math
 import random
+import select
 import time
 import sys
 import tty
 import termios
+from contextlib import contextmanager
 from typing import List, Tuple, Optional
 from .notes import get_violin_range_notes
 from .audio import AudioPlayer
 
+# A major scale: A, B, C#, D, E, F#, G#, A
+SCALE_NOTES = tuple(
+    (note_name, freq) for note_name, freq in get_violin_range_notes()
+    if note_name in ('A4', 'B4', 'C#5', 'D5', 'E5', 'F#5', 'G#5', 'A5')
+)
+
+def _print_lines(*lines: str) -> None:
+    """Print several lines with a single write and flush"""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
+# Arrow key escape sequences (after the leading ESC)
+_ESC_MAP = {'[A': 'up', '[B': 'down', '[C': 'right', '[D': 'left'}
+
+@contextmanager
+def _cbreak_mode(stream):
+    """
+    Put a terminal into cbreak mode for the duration of the with block.
+    
+    In cbreak mode each key press is delivered immediately and not echoed,
+    while Ctrl+C and normal output processing keep working. Streams that are
+    not terminals are left alone.
+    """
+    if not stream.isatty():
+        yield
+        return
+    
+    fd = stream.fileno()
+    old_settings = termios.tcgetattr(fd)
+    tty.setcbreak(fd)
+    try:
+        yield
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+
 class ScaleDetector:
     """Game to detect out-of-tune notes in an A major scale"""
     
@@ -21,41 +59,19 @@ class ScaleDetector:
         self.a_major_scale = self._get_a_major_scale()
     
     def _get_key_press(self) -> str:
-        """Get a single key press without requiring Enter"""
-        fd = sys.stdin.fileno()
-        old_settings = termios.tcgetattr(fd)
-        try:
-            tty.setraw(sys.stdin.fileno())
-            ch = sys.stdin.read(1)
-            # Handle arrow keys (they send 3 characters)
-            if ch == '\x1b':
-                ch2 = sys.stdin.read(1)
-                if ch2 == '[':
-                    ch3 = sys.stdin.read(1)
-                    if ch3 == 'A':
-                        return 'up'
-                    elif ch3 == 'B':
-                        return 'down'
-            return ch
-        finally:
-            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+        """Get a single key press without requiring Enter (stdin must be in cbreak mode)"""
+        ch = sys.stdin.read(1)
+        # Handle arrow keys (they send 3 characters)
+        if ch == '\x1b':
+            # Only an ESC '[' pair is followed by a third character
+            ch2 = sys.stdin.read(1)
+            if ch2 == '[':
+                return _ESC_MAP.get('[' + sys.stdin.read(1), ch)
+        return ch
     
     def _get_a_major_scale(self) -> List[Tuple[str, float]]:
         """Get the A major scale notes in order"""
-        all_notes = get_violin_range_notes()
-        # A major scale: A, B, C#, D, E, F#, G#, A
-        scale_notes = []
-        for note_name, freq in all_notes:
-            if note_name in ['A4', 'B4', 'C#5', 'D5', 'E5', 'F#5', 'G#5', 'A5']:
-                scale_notes.append((note_name, freq))
-        return scale_notes
-    
-    def _make_note_out_of_tune(self, frequency: float, cents_off: float) -> float:
-        """Make a note out of tune by the specified number of cents"""
-        # Calculate the out-of-tune frequency
-        # cents = 1200 * log2(f2/f1)
-        # f2 = f1 * 2^(cents/1200)
-        return frequency * (2 ** (cents_off / 1200))
+        return list(SCALE_NOTES)
     
     def _play_scale_with_correction(self, scale_notes: List[Tuple[str, float]], 
                                    out_of_tune_index: int, out_of_tune_freq: float) -> None:
@@ -110,14 +126,14 @@ class ScaleDetector:
     
     def run_game(self) -> None:
         """Run the scale detection game"""
-        print("🎻 Welcome to Scale Detective!")
-        print("=" * 40)
-        print("I'll play an A major scale, one note at a time.")
-        print("One note will be out of tune by", self.out_of_tune_cents, "cents.")
-        print("After each note, press:")
-        print("  Enter = 'OK' (note sounds in tune)")
-        print("  Z = 'Out of tune' (note sounds wrong)")
-        print()
+        _print_lines("🎻 Welcome to Scale Detective!",
+                     "=" * 40,
+                     "I'll play an A major scale, one note at a time.",
+                     f"One note will be out of tune by {self.out_of_tune_cents} cents.",
+                     "After each note, press:",
+                     "  Enter = 'OK' (note sounds in tune)",
+                     "  Z = 'Out of tune' (note sounds wrong)",
+                     "")
         
         # Select which note will be out of tune (not the first A)
         out_of_tune_index = random.randint(1, len(self.a_major_scale) - 1)
@@ -126,111 +142,110 @@ class ScaleDetector:
         # Randomly decide if the note will be sharp (high) or flat (low)
         is_sharp = random.choice([True, False])
         cents_off = self.out_of_tune_cents if is_sharp else -self.out_of_tune_cents
-        out_of_tune_freq = self._make_note_out_of_tune(correct_freq, cents_off)
+        # cents = 1200 * log2(f2/f1), so f2 = f1 * 2^(cents/1200)
+        out_of_tune_freq = correct_freq * math.pow(2.0, cents_off / 1200.0)
         
         input("Press Enter to start...")
         print()
         
-        # Play the scale one note at a time
-        for i, (note_name, freq) in enumerate(self.a_major_scale):
-            # Use out-of-tune frequency if this is the target note
-            play_freq = out_of_tune_freq if i == out_of_tune_index else freq
-            
-            print(f"Note {i + 1}")
+        # Read keys as soon as they are pressed (and without echo) for the
+        # whole round instead of switching terminal modes on every key
+        with _cbreak_mode(sys.stdin):
+            # Play the scale one note at a time
+            for i, (note_name, freq) in enumerate(self.a_major_scale):
+                # Use out-of-tune frequency if this is the target note
+                play_freq = out_of_tune_freq if i == out_of_tune_index else freq
             
-            # Play note without blocking and check for keypresses
-            self.audio_player.play_note_non_blocking(play_freq, duration=1.0, volume=0.3)
+                print(f"Note {i + 1}")
             
-            # Wait for either the note to finish or a keypress
-            start_time = time.time()
-            user_input = None
+                # Play note without blocking and check for keypresses
+                self.audio_player.play_note_non_blocking(play_freq, duration=1.0, volume=0.3)
             
-            while time.time() - start_time < 1.0 and user_input is None:
-                # Check if note is still playing
-                if not self.audio_player.is_note_playing():
-                    break
-                    
-                # Check for keypress
-                user_input = self.audio_player.check_for_keypress()
-                if user_input:
-                    # Stop the note immediately
-                    self.audio_player.stop_current_note()
-                    break
-                    
-                # Small delay to avoid busy waiting
-                time.sleep(0.01)
+                # Wait for either the note to finish or a keypress, sleeping in
+                # select() until a key arrives instead of polling
+                user_input = None
+                deadline = time.monotonic() + 1.0
+                remaining = 1.0
+                while remaining > 0 and self.audio_player.is_note_playing():
+                    ready, _, _ = select.select([sys.stdin], [], [], remaining)
+                    if ready:
+                        user_input = self._get_key_press()
+                        # Stop the note immediately
+                        self.audio_player.stop_current_note()
+                        break
+                    remaining = deadline - time.monotonic()
+                
+                # If no key was pressed during playback, wait for input after note finishes
+                if user_input is None:
+                    if self.hard_mode:
+                        print("Press: ↑ (too high), ↓ (too low), Enter (in tune)")
+                        user_input = self._get_key_press()
+                    else:
+                        print("Press: / (out of tune), Enter (in tune)")
+                        user_input = self._get_key_press()
             
-            # If no key was pressed during playback, wait for input after note finishes
-            if user_input is None:
+                # Check the response
                 if self.hard_mode:
-                    print("Press: ↑ (too high), ↓ (too low), Enter (in tune)")
-                    user_input = self._get_key_press()
+                    # Hard mode: require direction detection
+                    if user_input in ['up', 'down']:  # User said out of tune
+                        if i == out_of_tune_index:  # Correctly identified out-of-tune note
+                            # Check if they got the direction right
+                            if (user_input == 'up' and is_sharp) or (user_input == 'down' and not is_sharp):
+                                print("🎉 Well done! You found the out-of-tune note and got the direction right!")
+                                self._play_victory_sequence(self.a_major_scale, out_of_tune_index, out_of_tune_freq)
+                                print("\nGreat work! Keep training your ear! 🎵")
+                                return
+                            else:
+                                _print_lines("❌ GAME OVER! You found the out-of-tune note but got the direction wrong.",
+                                             f"The {out_of_tune_note} was {'sharp' if is_sharp else 'flat'} by {self.out_of_tune_cents} cents.")
+                                self._play_scale_with_correction(self.a_major_scale, out_of_tune_index, out_of_tune_freq)
+                                print("\nKeep practicing! Your ear will get stronger! 🎵")
+                                return
+                        else:  # Incorrectly said in-tune note was out of tune
+                            lines = ["❌ Not quite right. That note was actually in tune."]
+                            if i < len(self.a_major_scale) - 1:
+                                lines += ["Let's continue...", ""]
+                            _print_lines(*lines)
+                    else:  # User said in tune (Enter)
+                        if i == out_of_tune_index:  # Missed the out-of-tune note
+                            _print_lines("❌ GAME OVER! You missed the out-of-tune note.",
+                                         f"The {out_of_tune_note} was {'sharp' if is_sharp else 'flat'} by {self.out_of_tune_cents} cents.")
+                            self._play_scale_with_correction(self.a_major_scale, out_of_tune_index, out_of_tune_freq)
+                            print("\nKeep practicing! Your ear will get stronger! 🎵")
+                            return
+                        else:  # Correctly said in-tune note was OK
+                            lines = ["✅ Correct! That note was in tune."]
+                            if i < len(self.a_major_scale) - 1:
+                                lines += ["Let's continue...", ""]
+                            _print_lines(*lines)
                 else:
-                    print("Press: / (out of tune), Enter (in tune)")
-                    user_input = self._get_key_press()
-            
-            # Check the response
-            if self.hard_mode:
-                # Hard mode: require direction detection
-                if user_input in ['up', 'down']:  # User said out of tune
-                    if i == out_of_tune_index:  # Correctly identified out-of-tune note
-                        # Check if they got the direction right
-                        if (user_input == 'up' and is_sharp) or (user_input == 'down' and not is_sharp):
-                            print("🎉 Well done! You found the out-of-tune note and got the direction right!")
+                    # Easy mode: just detect if out of tune
+                    if user_input == '/':  # User said out of tune
+                        if i == out_of_tune_index:  # Correctly identified out-of-tune note
+                            print("🎉 Well done! You found the out-of-tune note!")
                             self._play_victory_sequence(self.a_major_scale, out_of_tune_index, out_of_tune_freq)
                             print("\nGreat work! Keep training your ear! 🎵")
                             return
-                        else:
-                            print("❌ GAME OVER! You found the out-of-tune note but got the direction wrong.")
-                            print(f"The {out_of_tune_note} was {'sharp' if is_sharp else 'flat'} by {self.out_of_tune_cents} cents.")
+                        else:  # Incorrectly said in-tune note was out of tune
+                            lines = ["❌ Not quite right. That note was actually in tune."]
+                            if i < len(self.a_major_scale) - 1:
+                                lines += ["Let's continue...", ""]
+                            _print_lines(*lines)
+                    else:  # User said in tune (Enter)
+                        if i == out_of_tune_index:  # Missed the out-of-tune note
+                            _print_lines("❌ GAME OVER! You missed the out-of-tune note.",
+                                         f"The {out_of_tune_note} was {'sharp' if is_sharp else 'flat'} by {self.out_of_tune_cents} cents.")
                             self._play_scale_with_correction(self.a_major_scale, out_of_tune_index, out_of_tune_freq)
                             print("\nKeep practicing! Your ear will get stronger! 🎵")
                             return
-                    else:  # Incorrectly said in-tune note was out of tune
-                        print("❌ Not quite right. That note was actually in tune.")
-                        if i < len(self.a_major_scale) - 1:
-                            print("Let's continue...")
-                            print()
-                else:  # User said in tune (Enter)
-                    if i == out_of_tune_index:  # Missed the out-of-tune note
-                        print("❌ GAME OVER! You missed the out-of-tune note.")
-                        print(f"The {out_of_tune_note} was {'sharp' if is_sharp else 'flat'} by {self.out_of_tune_cents} cents.")
-                        self._play_scale_with_correction(self.a_major_scale, out_of_tune_index, out_of_tune_freq)
-                        print("\nKeep practicing! Your ear will get stronger! 🎵")
-                        return
-                    else:  # Correctly said in-tune note was OK
-                        print("✅ Correct! That note was in tune.")
-                        if i < len(self.a_major_scale) - 1:
-                            print("Let's continue...")
-                            print()
-            else:
-                # Easy mode: just detect if out of tune
-                if user_input == '/':  # User said out of tune
-                    if i == out_of_tune_index:  # Correctly identified out-of-tune note
-                        print("🎉 Well done! You found the out-of-tune note!")
-                        self._play_victory_sequence(self.a_major_scale, out_of_tune_index, out_of_tune_freq)
-                        print("\nGreat work! Keep training your ear! 🎵")
-                        return
-                    else:  # Incorrectly said in-tune note was out of tune
-                        print("❌ Not quite right. That note was actually in tune.")
-                        if i < len(self.a_major_scale) - 1:
-                            print("Let's continue...")
-                            print()
-                else:  # User said in tune (Enter)
-                    if i == out_of_tune_index:  # Missed the out-of-tune note
-                        print("❌ GAME OVER! You missed the out-of-tune note.")
-                        print(f"The {out_of_tune_note} was {'sharp' if is_sharp else 'flat'} by {self.out_of_tune_cents} cents.")
-                        self._play_scale_with_correction(self.a_major_scale, out_of_tune_index, out_of_tune_freq)
-                        print("\nKeep practicing! Your ear will get stronger! 🎵")
-                        return
-                    else:  # Correctly said in-tune note was OK
-                        print("✅ Correct! That note was in tune.")
-                        if i < len(self.a_major_scale) - 1:
-                            print("Let's continue...")
-                            print()
+                        else:  # Correctly said in-tune note was OK
+                            lines = ["✅ Correct! That note was in tune."]
+                            if i < len(self.a_major_scale) - 1:
+                                lines += ["Let's continue...", ""]
+                            _print_lines(*lines)
         
         # If we get here, they went through the whole scale without finding it
-        print("❌ GAME OVER! You went through the whole scale without finding the out-of-tune note.")
-        print(f"The {out_of_tune_note} was {'sharp' if is_sharp else 'flat'} by {self.out_of_tune_cents} cents.")
+        _print_lines("❌ GAME OVER! You went through the whole scale without finding the out-of-tune note.",
+                     f"The {out_of_tune_note} was {'sharp' if is_sharp else 'flat'} by {self.out_of_tune_cents} cents.")
         self._play_scale_with_correction(self.a_major_scale, out_of_tune_index, out_of_tune_freq)
         print("\nKeep practicing! Your ear will get stronger! 🎵") 
\ No newline at end of file
@@ -4,7 +4,6 @@ CLI entry point for Scale Detective game
 
 import argparse
 import sys
-from .scale_detector import ScaleDetector
 
 def main():
     """Main CLI function for Scale Detective"""
@@ -33,6 +32,12 @@ Examples:
         help='Hard mode: require direction detection (up/down arrows)'
     )
     
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help="Don't ask for confirmation when cents is over 200"
+    )
+    
     args = parser.parse_args()
     
     # Validate arguments
@@ -41,12 +46,19 @@ Examples:
         sys.exit(1)
     
     if args.cents > 200:
-        print("Warning: {args.cents} cents is very out of tune (more than 2 semitones)")
-        response = input("Continue anyway? (y/N): ").strip().lower()
-        if response != 'y':
-            sys.exit(0)
+        print(f"Warning: {args.cents} cents is very out of tune (more than 2 semitones)")
+        # Only ask when someone is there to answer
+        if not args.force and sys.stdin.isatty():
+            response = input("Continue anyway? (y/N): ").strip().lower()
+            if response != 'y':
+                sys.exit(0)
+    
+    # Imported here so --help and bad arguments don't wait for numpy and the
+    # audio backend to load
+    from .scale_detector import ScaleDetector
     
     # Create and run the game
+    game = None
     try:
         game = ScaleDetector(out_of_tune_cents=args.cents, hard_mode=args.hard)
         game.run_game()
@@ -56,6 +68,9 @@ Examples:
         print(f"\nError: {e}")
         print("Make sure your speakers are working properly.")
         sys.exit(1)
+    finally:
+        if game is not None:
+            game.audio_player.close()
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    raise SystemExit(main()) 
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+Tests for pitch detection in the audio module
+"""
+
+import queue
+from contextlib import contextmanager
+
+import pytest
+import numpy as np
+
+pytest.importorskip("sounddevice")
+
+from hide_and_seek.audio import AudioPlayer, STREAM_BLOCKSIZE
+from hide_and_seek.notes import get_violin_range_notes
+
+SAMPLE_RATE = 44100
+
+@pytest.fixture(scope='module')
+def player():
+    """An AudioPlayer for pitch detection (no audio streams are opened)"""
+    audio_player = AudioPlayer(SAMPLE_RATE)
+    yield audio_player
+    audio_player.close()
+
+def make_tone(frequency, harmonics=(1.0,), duration=1.0, noise=0.0, seed=0):
+    """Tone with the given harmonic amplitudes, plus optional white noise"""
+    t = np.arange(int(SAMPLE_RATE * duration)) / SAMPLE_RATE
+    tone = sum(amplitude * np.sin(2 * np.pi * frequency * (number + 1) * t)
+               for number, amplitude in enumerate(harmonics))
+    if noise:
+        tone = tone + noise * np.random.default_rng(seed).standard_normal(len(t))
+    return tone.astype(np.float32)
+
+def cents_off(detected, expected):
+    """Distance from expected to detected in cents"""
+    return 1200 * np.log2(detected / expected)
+
+@pytest.mark.parametrize("note_name, frequency", get_violin_range_notes())
+def test_detect_pitch_scale_notes(player, note_name, frequency):
+    """Test that every scale note is detected within a few cents"""
+    detected = player.detect_pitch(make_tone(frequency, harmonics=(1.0, 0.6, 0.4, 0.3), noise=0.05))
+    
+    assert detected is not None
+    assert abs(cents_off(detected, frequency)) < 5
+
+@pytest.mark.parametrize("frequency", [440.0, 587.3, 880.0])
+def test_detect_pitch_strong_second_harmonic(player, frequency):
+    """Test that a tone dominated by its second harmonic reports the fundamental"""
+    detected = player.detect_pitch(make_tone(frequency, harmonics=(0.3, 1.0, 0.5, 0.3), noise=0.05))
+    
+    assert detected is not None
+    assert abs(cents_off(detected, frequency)) < 5
+
+def test_detect_pitch_silence(player):
+    """Test that silence has no pitch"""
+    assert player.detect_pitch(np.zeros(SAMPLE_RATE, dtype=np.float32)) is None
+
+def test_detect_pitch_noise(player):
+    """Test that white noise has no pitch"""
+    noise = np.random.default_rng(1).standard_normal(SAMPLE_RATE).astype(np.float32)
+    
+    assert player.detect_pitch(noise) is None
+
+def test_detect_pitch_short_input(player):
+    """Test short recordings: detected if long enough, otherwise None"""
+    # ~113 ms is shorter than one analysis frame but spans many periods
+    detected = player.detect_pitch(make_tone(440.0, duration=5000 / SAMPLE_RATE))
+    assert detected is not None
+    assert abs(cents_off(detected, 440.0)) < 5
+    
+    # Too short to hold two periods of the lowest detectable note
+    assert player.detect_pitch(make_tone(440.0, duration=200 / SAMPLE_RATE)) is None
+    assert player.detect_pitch(np.array([], dtype=np.float32)) is None
+
+@pytest.fixture
+def captured(player, monkeypatch):
+    """Replace the microphone with a queue of blocks the test fills in"""
+    blocks = queue.Queue()
+    
+    @contextmanager
+    def fake_capture():
+        yield blocks
+    
+    monkeypatch.setattr(player, '_capture', fake_capture)
+    monkeypatch.setattr(player, 'play_click_sound', lambda: None)
+    return blocks
+
+def queue_blocks(blocks, audio):
+    """Split audio into stream-sized blocks and queue them"""
+    for start in range(0, len(audio), STREAM_BLOCKSIZE):
+        blocks.put(audio[start:start + STREAM_BLOCKSIZE])
+
+def test_record_until_stable_stops_early(player, captured):
+    """Test that a steady tone stops recording well before the duration"""
+    queue_blocks(captured, make_tone(523.25, harmonics=(1.0, 0.5, 0.3), duration=3.0, noise=0.05))
+    total = captured.qsize()
+    
+    detected = player.record_until_stable(duration=3.0)
+    
+    assert detected is not None
+    assert abs(cents_off(detected, 523.25)) < 5
+    # Under half a second of the three was needed
+    assert (total - captured.qsize()) * STREAM_BLOCKSIZE / SAMPLE_RATE < 0.5
+
+def test_record_until_stable_never_settles(player, captured, monkeypatch):
+    """Test that a gliding pitch is detected from the whole recording"""
+    # Exponential glide from 250 Hz to 900 Hz, over 100 cents per estimate
+    t = np.arange(2 * SAMPLE_RATE) / SAMPLE_RATE
+    rate = np.log(900 / 250) / 2
+    glide = np.sin(2 * np.pi * 250 * np.expm1(rate * t) / rate).astype(np.float32)
+    queue_blocks(captured, glide)
+    
+    lengths = []
+    detect_pitch = player.detect_pitch
+    def spy(audio, *args, **kwargs):
+        lengths.append(len(audio))
+        return detect_pitch(audio, *args, **kwargs)
+    monkeypatch.setattr(player, 'detect_pitch', spy)
+    
+    player.record_until_stable(duration=2.0)
+    
+    assert captured.empty()
+    assert lengths[-1] == len(glide)
+
+def test_record_until_stable_microphone_stopped(player, captured):
+    """Test that recording gives up when no audio arrives"""
+    with pytest.raises(RuntimeError):
+        player.record_until_stable(duration=1.0)
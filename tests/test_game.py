@@ -0,0 +1,50 @@
+"""
+Tests for the game module
+"""
+
+import pytest
+
+pytest.importorskip("sounddevice")
+
+from hide_and_seek.game import HideAndSeekGame
+
+@pytest.fixture(scope='module')
+def game():
+    """A game for testing note selection (no audio is played)"""
+    hide_and_seek_game = HideAndSeekGame()
+    yield hide_and_seek_game
+    hide_and_seek_game.audio_player.close()
+
+@pytest.mark.parametrize("note_count", range(2, 9))
+def test_generate_note_sequence(game, note_count):
+    """Test that sequences have the requested length and no note twice in a row"""
+    distinct_notes = game.available_notes[:note_count]
+    
+    for _ in range(20):
+        sequence = game.generate_note_sequence(distinct_notes, 50)
+        
+        assert len(sequence) == 50
+        assert all(note in distinct_notes for note in sequence)
+        assert all(previous != note for previous, note in zip(sequence, sequence[1:]))
+
+def test_generate_note_sequence_single_note(game):
+    """Test that a single distinct note is simply repeated"""
+    note = game.available_notes[0]
+    
+    assert game.generate_note_sequence([note], 5) == [note] * 5
+    assert game.generate_note_sequence([note], 0) == []
+
+@pytest.mark.parametrize("frequency, note_name, cents", [
+    (440.0, 'A4', 0.0),
+    (500.0, 'B4', 21.3),      # sharp of B4
+    (430.0, 'A4', -39.8),     # flat of A4
+    (600.0, 'D5', 37.0),      # between D5 and E5, nearer D5
+    (1000.0, 'A5', 221.3),    # above the range: the top note
+    (300.0, 'A4', -663.0),    # below the range: the bottom note
+])
+def test_closest_note(game, frequency, note_name, cents):
+    """Test the nearest note and its offset, in and out of range"""
+    closest_name, closest_cents = game.closest_note(frequency)
+    
+    assert closest_name == note_name
+    assert closest_cents == pytest.approx(cents, abs=0.1)
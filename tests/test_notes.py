@@ -8,7 +8,12 @@ from hide_and_seek.notes import (
     get_note_frequency,
     get_violin_range_notes,
     generate_sine_wave,
-    is_note_close
+    is_note_close,
+    is_note_close_vec,
+    cents_diff,
+    _sine_wave,
+    _wavetable,
+    WAVETABLE_TOLERANCE_CENTS
 )
 
 def test_get_note_frequency():
@@ -35,23 +40,63 @@ def test_get_violin_range_notes():
         assert isinstance(frequency, float)
         assert frequency > 0
 
-def test_generate_sine_wave():
+@pytest.mark.parametrize("freq", [110.0, 440.0, 1760.0])
+@pytest.mark.parametrize("duration", [0.25, 1.0])
+@pytest.mark.parametrize("sample_rate", [22050, 44100, 48000])
+@pytest.mark.parametrize("dtype", [np.float32, np.int16])
+def test_generate_sine_wave(freq, duration, sample_rate, dtype):
     """Test sine wave generation"""
-    freq = 440.0
-    duration = 1.0
-    sample_rate = 44100
-    
-    wave = generate_sine_wave(freq, duration, sample_rate)
+    wave = generate_sine_wave(freq, duration, sample_rate, dtype=dtype)
     
     # Should have correct length
-    expected_length = int(sample_rate * duration)
+    expected_length = round(sample_rate * duration)
     assert len(wave) == expected_length
     
     # Should be numpy array
     assert isinstance(wave, np.ndarray)
     
-    # Should have reasonable amplitude
-    assert np.max(np.abs(wave)) <= 1.0
+    # Should be the requested sample type
+    assert wave.dtype == dtype
+    
+    # Should peak at full scale (32767 for 16-bit PCM) and not beyond
+    peak = np.max(np.abs(wave / 32767 if dtype == np.int16 else wave))
+    assert peak <= 1.0 + 1 / 32767
+    assert peak > 0.99
+
+@pytest.mark.parametrize("freq", [440.0, 493.8833012561241, 739.9888454232688, 1760.0, 427.3])
+@pytest.mark.parametrize("sample_rate", [22050, 44100, 48000])
+def test_generate_sine_wave_pitch(freq, sample_rate):
+    """Test that looped waves are exact sines within tolerance of the requested pitch"""
+    table = _wavetable(freq, sample_rate)
+    assert table is not None
+    
+    # The table holds a whole number of cycles, which fixes its actual pitch
+    cycles = round(len(table) * freq / sample_rate)
+    actual_freq = cycles * sample_rate / len(table)
+    assert abs(1200 * np.log2(actual_freq / freq)) <= WAVETABLE_TOLERANCE_CENTS
+    
+    # Compared with a sine at that pitch, every sample (and so every seam
+    # between copies of the table) matches
+    wave = generate_sine_wave(freq, 2.0, sample_rate)
+    expected = np.sin(2 * np.pi * actual_freq * np.arange(len(wave)) / sample_rate)
+    assert np.max(np.abs(wave - expected)) < 1e-5
+
+def test_generate_sine_wave_zero_frequency():
+    """Test that a zero frequency gives silence"""
+    wave = generate_sine_wave(0.0, 0.5, 44100)
+    
+    assert len(wave) == 22050
+    assert not np.any(wave)
+
+def _clear_sine_wave_caches():
+    """Forget cached waves and wavetables so the benchmark times generation"""
+    _sine_wave.cache_clear()
+    _wavetable.cache_clear()
+
+def test_generate_sine_wave_perf(benchmark):
+    """Benchmark generating a one-second note (caches cleared every round)"""
+    benchmark.pedantic(generate_sine_wave, args=(440.0, 1.0, 44100),
+                       setup=_clear_sine_wave_caches, rounds=50, warmup_rounds=5)
 
 def test_is_note_close():
     """Test note closeness detection"""
@@ -70,4 +115,30 @@ def test_is_note_close():
     
     # Invalid frequencies should return False
     assert not is_note_close(0.0, 440.0)
-    assert not is_note_close(440.0, -1.0) 
\ No newline at end of file
+    assert not is_note_close(440.0, -1.0)
+
+@pytest.mark.parametrize("reference, tolerance", [
+    (440.0, 50.0),
+    (440.0, 10.0),
+    (659.3, 100.0),
+    (0.0, 50.0),
+    (np.inf, 50.0),
+])
+def test_is_note_close_vec_matches_scalar(reference, tolerance):
+    """Test that the vectorized check agrees with is_note_close"""
+    frequencies = np.array([440.0, 441.0, 450.0, 466.2, 659.3, 880.0, 0.0, -1.0, np.nan, np.inf])
+    
+    result = is_note_close_vec(reference, frequencies, tolerance_cents=tolerance)
+    
+    expected = [is_note_close(reference, f, tolerance_cents=tolerance) for f in frequencies.tolist()]
+    assert result.tolist() == expected
+
+def test_cents_diff():
+    """Test cent distances against the exact log2 formula"""
+    for cents in np.linspace(-200.0, 200.0, 401):
+        frequency = 440.0 * 2 ** (cents / 1200)
+        assert abs(cents_diff(440.0, frequency) - 1200 * np.log2(frequency / 440.0)) < 1e-9
+    
+    # Sharp is positive, flat is negative
+    assert cents_diff(440.0, 880.0) == pytest.approx(1200.0)
+    assert cents_diff(880.0, 440.0) == pytest.approx(-1200.0)